@@ -18,7 +18,20 @@ class Settings(BaseSettings):
 
     # FFmpeg
     ffmpeg_path: str = "ffmpeg"
+    ffprobe_path: str = "ffprobe"
     screenshot_quality: int = 2  # 1 (best) to 31 (worst) for -q:v
+    # Frame-accurate screenshots decode forward from the nearest keyframe,
+    # which is slower; the default keyframe snap is near-instant.
+    screenshot_accurate: bool = False
+    # Hardware decode for screenshots: "auto" probes `ffmpeg -hwaccels` at
+    # startup, or pin one of "vaapi" / "cuda" / "videotoolbox". "none"
+    # keeps software decode.
+    hwaccel: str = "none"
+
+    # Sessions
+    # Per-backend fetch deadline: a hung media server degrades to a logged
+    # warning instead of stalling the other backend's results.
+    session_fetch_timeout: float = 2.0
 
     # Server
     host: str = "0.0.0.0"
@@ -1,15 +1,47 @@
 """SQLite database setup and access."""
 
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
 import aiosqlite
 
 from config import settings
 
+# WAL lets gallery reads proceed while a capture insert/update is in flight,
+# and synchronous=NORMAL halves the fsyncs per commit (safe under WAL).
+# journal_mode/synchronous persist in the database file; the rest are
+# per-connection and must be reapplied on every connect.
+_DB_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-64000;
+PRAGMA mmap_size=268435456;
+PRAGMA busy_timeout=30000;
+"""
+
+# Per-connection pragmas for the read-only pool. journal_mode is persisted in
+# the file header (set by the writer) and cannot be changed on a mode=ro
+# connection, so it is omitted here.
+_RO_PRAGMAS = """
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-64000;
+PRAGMA mmap_size=268435456;
+PRAGMA busy_timeout=30000;
+"""
+
+# Rows are kept narrow on purpose: created_at is epoch seconds (8 bytes vs a
+# 25-byte ISO string) and the source media path is not stored — it is only
+# needed transiently during extraction. Smaller rows mean more rows per page
+# and fewer page reads for the gallery. user_version tracks schema revisions.
+_SCHEMA_VERSION = 1
+
 _DB_SCHEMA = """
 CREATE TABLE IF NOT EXISTS captures (
     id TEXT PRIMARY KEY,
     source TEXT NOT NULL,           -- 'plex' or 'jellyfin'
     media_title TEXT NOT NULL,
-    media_path TEXT NOT NULL,
     timestamp_seconds REAL NOT NULL,
     capture_type TEXT NOT NULL,     -- 'screenshot' or 'clip'
     file_path TEXT NOT NULL,
@@ -18,18 +50,149 @@ CREATE TABLE IF NOT EXISTS captures (
     duration_seconds REAL,          -- only for clips
     status TEXT NOT NULL DEFAULT 'pending',  -- pending / complete / failed
     error_message TEXT,
-    created_at TEXT NOT NULL
+    created_at INTEGER NOT NULL     -- unix epoch seconds (UTC)
+);
+
+-- Let the gallery's ORDER BY created_at DESC stream straight off an index
+-- instead of scanning and sorting the whole table.
+CREATE INDEX IF NOT EXISTS ix_captures_created
+    ON captures(created_at DESC);
+CREATE INDEX IF NOT EXISTS ix_captures_type_created
+    ON captures(capture_type, created_at DESC);
+
+-- Cached keyframe timestamps per media file, so repeat clips can seek
+-- straight to a known cut point without ffprobe re-scanning the container.
+-- mtime/file_size invalidate the entry when the source file changes.
+CREATE TABLE IF NOT EXISTS media_keyframes (
+    media_path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    file_size INTEGER NOT NULL,
+    keyframe_times TEXT NOT NULL    -- JSON array of seconds, ascending
 );
 """
 
+# One long-lived read-write connection shared by all writers. Opening a fresh
+# SQLite connection per request costs file-open syscalls and a cold page cache
+# on every call; SQLite itself is happy with a single connection per process.
+_db: Optional[aiosqlite.Connection] = None
+
+# Under WAL, any number of readers can run while the single writer proceeds.
+# A small pool of mode=ro connections serves the gallery endpoints so browsing
+# never queues behind an in-flight capture insert/update.
+_RO_POOL_SIZE = 4
+_ro_pool: Optional[asyncio.Queue] = None
+
+# SQLite allows only one writer at a time — serialize writes in-process so
+# concurrent requests queue here instead of hitting "database is locked".
+write_lock = asyncio.Lock()
+
 
 async def init_db():
-    async with aiosqlite.connect(settings.db_path) as db:
+    """Open the shared connections and apply the schema. Called at startup."""
+    global _db, _ro_pool
+    _db = await aiosqlite.connect(settings.db_path)
+    _db.row_factory = aiosqlite.Row
+    await _db.executescript(_DB_PRAGMAS)
+    await _migrate(_db)
+    await _db.executescript(_DB_SCHEMA)
+    await _db.commit()
+
+    # The read pool opens after the writer so the file and schema exist.
+    _ro_pool = asyncio.Queue(maxsize=_RO_POOL_SIZE)
+    for _ in range(_RO_POOL_SIZE):
+        ro = await aiosqlite.connect(f"file:{settings.db_path}?mode=ro", uri=True)
+        ro.row_factory = aiosqlite.Row
+        await ro.executescript(_RO_PRAGMAS)
+        _ro_pool.put_nowait(ro)
+
+
+async def _migrate(db: aiosqlite.Connection):
+    """One-shot migrations, guarded by PRAGMA user_version. Runs before the
+    schema script so rebuilds see the table in its legacy shape."""
+    cursor = await db.execute("PRAGMA user_version")
+    version = (await cursor.fetchone())[0]
+    if version >= _SCHEMA_VERSION:
+        return
+
+    # v0 -> v1: created_at was an ISO-8601 TEXT column and media_path was
+    # stored per row. Column types cannot be altered in place, so rebuild the
+    # table, converting timestamps to epoch seconds and dropping media_path.
+    cursor = await db.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'captures'"
+    )
+    if await cursor.fetchone():
+        await db.executescript("""
+            DROP INDEX IF EXISTS ix_captures_created;
+            DROP INDEX IF EXISTS ix_captures_type_created;
+            ALTER TABLE captures RENAME TO captures_v0;
+        """)
         await db.executescript(_DB_SCHEMA)
-        await db.commit()
+        await db.execute(
+            """INSERT INTO captures
+               (id, source, media_title, timestamp_seconds, capture_type,
+                file_path, file_name, file_size_bytes, duration_seconds,
+                status, error_message, created_at)
+               SELECT id, source, media_title, timestamp_seconds, capture_type,
+                      file_path, file_name, file_size_bytes, duration_seconds,
+                      status, error_message,
+                      CAST(strftime('%s', created_at) AS INTEGER)
+               FROM captures_v0"""
+        )
+        await db.execute("DROP TABLE captures_v0")
+    await db.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+
+async def close_db():
+    """Close the shared connections. Called at shutdown."""
+    global _db, _ro_pool
+    if _ro_pool is not None:
+        while not _ro_pool.empty():
+            await (_ro_pool.get_nowait()).close()
+        _ro_pool = None
+    if _db is not None:
+        # Refresh planner statistics so the next start picks good query plans.
+        await _db.execute("PRAGMA optimize")
+        await _db.close()
+        _db = None
+
+
+async def get_rw_db() -> aiosqlite.Connection:
+    """Return the shared read-write connection (use with write_lock)."""
+    assert _db is not None, "init_db() has not run"
+    return _db
+
+
+@asynccontextmanager
+async def write_txn() -> AsyncIterator[aiosqlite.Connection]:
+    """Run a write transaction on the shared connection.
+
+    BEGIN IMMEDIATE takes SQLite's write lock up front instead of
+    upgrading mid-transaction, so the enclosed statements and the commit
+    are a single fsync. On failure the transaction is rolled back before
+    the error propagates — essential on a shared connection, where a
+    dangling open transaction would make every later write fail with
+    "cannot start a transaction within a transaction".
+    """
+    db = await get_rw_db()
+    async with write_lock:
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+            # Commit inside the protected region: a commit-stage failure
+            # (e.g. SQLITE_FULL) must roll back too, or the connection
+            # stays inside the open transaction.
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            raise
 
 
-async def get_db() -> aiosqlite.Connection:
-    db = await aiosqlite.connect(settings.db_path)
-    db.row_factory = aiosqlite.Row
-    return db
\ No newline at end of file
+@asynccontextmanager
+async def get_ro_db() -> AsyncIterator[aiosqlite.Connection]:
+    """Borrow a read-only connection from the pool."""
+    assert _ro_pool is not None, "init_db() has not run"
+    ro = await _ro_pool.get()
+    try:
+        yield ro
+    finally:
+        _ro_pool.put_nowait(ro)
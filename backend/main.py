@@ -5,11 +5,15 @@ from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from config import settings
-from database import init_db
+from database import close_db, init_db
 from routers import captures, proxy, sessions
+from services.ffmpeg import detect_hwaccel
+from services.http import close_client
+from services.session_manager import start_refresher, stop_refresher
 
 
 @asynccontextmanager
@@ -17,8 +21,13 @@ async def lifespan(app: FastAPI):
     # Startup
     Path(settings.capture_dir).mkdir(parents=True, exist_ok=True)
     await init_db()
+    await detect_hwaccel()
+    start_refresher()
     yield
-    # Shutdown (nothing to clean up)
+    # Shutdown
+    await stop_refresher()
+    await close_client()
+    await close_db()
 
 
 app = FastAPI(
@@ -26,6 +35,8 @@ app = FastAPI(
     description="Screenshot & clip tool for Plex/Jellyfin",
     version="0.1.0",
     lifespan=lifespan,
+    # orjson serializes every JSON response (sessions, gallery pages) in C
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -39,10 +50,25 @@ app.include_router(sessions.router, prefix="/api")
 app.include_router(captures.router, prefix="/api")
 app.include_router(proxy.router, prefix="/api")
 
+
+class CaptureFiles(StaticFiles):
+    """Static serving for captures with immutable cache headers.
+
+    Capture file names are UUIDs, so a URL's content never changes —
+    browsers can cache gallery thumbnails and clips indefinitely instead
+    of revalidating on every view.
+    """
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
 # Serve captured files
 app.mount(
     "/captures",
-    StaticFiles(directory=settings.capture_dir),
+    CaptureFiles(directory=settings.capture_dir),
     name="captures",
 )
 
@@ -14,6 +14,7 @@ class Session(BaseModel):
     source: str  # "plex" | "jellyfin"
     title: str
     subtitle: str = ""  # e.g. "S02E05 - The One With..."
+    display_title: str = ""  # "{title} — {subtitle}", precomputed at ingest
     media_path: str  # absolute path on the server filesystem
     position_seconds: float
     duration_seconds: float
@@ -1,5 +1,6 @@
 """Captures router — screenshot and clip creation, gallery, deletion."""
 
+import asyncio
 import os
 import uuid
 from datetime import datetime, timezone
@@ -8,13 +9,25 @@ from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
 from fastapi.responses import FileResponse
 
 from config import settings
-from database import get_db
+from database import get_ro_db, write_txn
 from models import Capture, ClipRequest, ScreenshotRequest
-from services.ffmpeg import extract_clip, extract_screenshot
-from services.session_manager import get_cached_session
+from services.ffmpeg import extract_clip, extract_screenshot, snap_to_keyframe
+from services.session_manager import get_cached_session, request_refresh
 
 router = APIRouter(tags=["captures"])
 
+# Explicit column list (matching _build_capture_response) so the planner can
+# consider index-only scans instead of always touching the table row.
+_CAPTURE_COLUMNS = (
+    "id, source, media_title, timestamp_seconds, capture_type, file_name, "
+    "file_size_bytes, duration_seconds, status, error_message, created_at"
+)
+
+
+def _iso(epoch_seconds: int) -> str:
+    """Format a stored epoch timestamp as the ISO 8601 string clients expect."""
+    return datetime.fromtimestamp(epoch_seconds, timezone.utc).isoformat()
+
 
 def _build_capture_response(row) -> Capture:
     return Capture(
@@ -29,7 +42,7 @@ def _build_capture_response(row) -> Capture:
         duration_seconds=row["duration_seconds"],
         status=row["status"],
         error_message=row["error_message"],
-        created_at=row["created_at"],
+        created_at=_iso(row["created_at"]),
     )
 
 
@@ -41,18 +54,21 @@ async def take_screenshot(req: ScreenshotRequest):
     if not session:
         raise HTTPException(404, "Session not found. Refresh the sessions list.")
 
+    # The cached position drifts between polls; nudge the refresher so the
+    # next capture from this session works from a fresher snapshot.
+    request_refresh()
+
     ts = max(0.0, session.position_seconds + req.offset_seconds)
     ts = min(ts, session.duration_seconds)
 
     capture_id = str(uuid.uuid4())
     file_name = f"{capture_id}.jpg"
     output_path = os.path.join(settings.capture_dir, file_name)
-    now = datetime.now(timezone.utc).isoformat()
+    now = int(datetime.now(timezone.utc).timestamp())
 
     # Synchronous-ish: screenshots are fast enough (<1s) to do inline
     try:
-        await extract_screenshot(session.media_path, ts, output_path)
-        file_size = os.path.getsize(output_path)
+        file_size = await extract_screenshot(session.media_path, ts, output_path)
         status = "complete"
         error = None
     except Exception as e:
@@ -60,26 +76,21 @@ async def take_screenshot(req: ScreenshotRequest):
         status = "failed"
         error = str(e)
 
-    # Persist to DB
-    db = await get_db()
-    try:
+    async with write_txn() as db:
         await db.execute(
             """INSERT INTO captures
-               (id, source, media_title, media_path, timestamp_seconds,
+               (id, source, media_title, timestamp_seconds,
                 capture_type, file_path, file_name, file_size_bytes,
                 status, error_message, created_at)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
             (
                 capture_id, session.source,
-                f"{session.title} — {session.subtitle}".strip(" —"),
-                session.media_path, ts,
+                session.display_title,
+                ts,
                 "screenshot", output_path, file_name, file_size,
                 status, error, now,
             ),
         )
-        await db.commit()
-    finally:
-        await db.close()
 
     if status == "failed":
         raise HTTPException(500, f"Screenshot failed: {error}")
@@ -87,14 +98,14 @@ async def take_screenshot(req: ScreenshotRequest):
     return Capture(
         id=capture_id,
         source=session.source,
-        media_title=f"{session.title} — {session.subtitle}".strip(" —"),
+        media_title=session.display_title,
         timestamp_seconds=ts,
         capture_type="screenshot",
         file_name=file_name,
         file_url=f"/captures/{file_name}",
         file_size_bytes=file_size,
         status=status,
-        created_at=now,
+        created_at=_iso(now),
     )
 
 
@@ -105,22 +116,28 @@ async def _process_clip(
     duration: float, output_path: str,
 ):
     """Background task for clip extraction."""
-    db = await get_db()
     try:
-        await extract_clip(media_path, start, duration, output_path)
-        file_size = os.path.getsize(output_path)
-        await db.execute(
-            "UPDATE captures SET status='complete', file_size_bytes=? WHERE id=?",
-            (file_size, capture_id),
-        )
+        # Stream copy rounds the cut to a keyframe anyway — snap the start to
+        # the preceding one so ffmpeg's -ss lands in a single seek, keeping
+        # the requested end point by extending the duration.
+        snapped = await snap_to_keyframe(media_path, start)
+        if snapped < start:
+            duration += start - snapped
+            start = snapped
+        file_size = await extract_clip(media_path, start, duration, output_path)
+        async with write_txn() as db:
+            await db.execute(
+                "UPDATE captures SET status='complete', file_size_bytes=? WHERE id=?",
+                (file_size, capture_id),
+            )
     except Exception as e:
-        await db.execute(
-            "UPDATE captures SET status='failed', error_message=? WHERE id=?",
-            (str(e), capture_id),
-        )
-    finally:
-        await db.commit()
-        await db.close()
+        # write_txn rolled the failed transaction back, so recording the
+        # failure opens on a clean connection.
+        async with write_txn() as db:
+            await db.execute(
+                "UPDATE captures SET status='failed', error_message=? WHERE id=?",
+                (str(e), capture_id),
+            )
 
 
 @router.post("/capture/clip", response_model=Capture)
@@ -129,6 +146,8 @@ async def take_clip(req: ClipRequest, bg: BackgroundTasks):
     if not session:
         raise HTTPException(404, "Session not found. Refresh the sessions list.")
 
+    request_refresh()
+
     # Resolve start/end
     if req.relative_seconds is not None:
         start = max(0.0, session.position_seconds + req.relative_seconds)
@@ -150,28 +169,24 @@ async def take_clip(req: ClipRequest, bg: BackgroundTasks):
     capture_id = str(uuid.uuid4())
     file_name = f"{capture_id}.mp4"
     output_path = os.path.join(settings.capture_dir, file_name)
-    now = datetime.now(timezone.utc).isoformat()
+    now = int(datetime.now(timezone.utc).timestamp())
 
     # Insert as pending, process in background
-    db = await get_db()
-    try:
+    async with write_txn() as db:
         await db.execute(
             """INSERT INTO captures
-               (id, source, media_title, media_path, timestamp_seconds,
+               (id, source, media_title, timestamp_seconds,
                 capture_type, file_path, file_name, file_size_bytes,
                 duration_seconds, status, created_at)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, 'pending', ?)""",
+               VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?, 'pending', ?)""",
             (
                 capture_id, session.source,
-                f"{session.title} — {session.subtitle}".strip(" —"),
-                session.media_path, start,
+                session.display_title,
+                start,
                 "clip", output_path, file_name,
                 duration, now,
             ),
         )
-        await db.commit()
-    finally:
-        await db.close()
 
     bg.add_task(
         _process_clip, capture_id, session.media_path,
@@ -181,14 +196,14 @@ async def take_clip(req: ClipRequest, bg: BackgroundTasks):
     return Capture(
         id=capture_id,
         source=session.source,
-        media_title=f"{session.title} — {session.subtitle}".strip(" —"),
+        media_title=session.display_title,
         timestamp_seconds=start,
         capture_type="clip",
         file_name=file_name,
         file_url=f"/captures/{file_name}",
         duration_seconds=duration,
         status="pending",
-        created_at=now,
+        created_at=_iso(now),
     )
 
 
@@ -197,34 +212,48 @@ async def take_clip(req: ClipRequest, bg: BackgroundTasks):
 @router.get("/captures", response_model=list[Capture])
 async def list_captures(
     limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0),
     capture_type: str = Query(None),
+    before: str = Query(None, description="created_at of the last capture seen"),
+    before_id: str = Query(None, description="id of the last capture seen"),
 ):
-    db = await get_db()
-    try:
-        q = "SELECT * FROM captures"
-        params: list = []
-        if capture_type:
-            q += " WHERE capture_type = ?"
-            params.append(capture_type)
-        q += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
+    # Keyset pagination: OFFSET makes SQLite scan and discard `offset` rows,
+    # so deep pages get linearly slower. Paging on (created_at, id) instead
+    # seeks straight to the cursor via ix_captures_created. Clients pass the
+    # last row's created_at/id to fetch the next page.
+    conditions: list[str] = []
+    params: list = []
+    if capture_type:
+        conditions.append("capture_type = ?")
+        params.append(capture_type)
+    if bool(before) != bool(before_id):
+        # A lone half of the cursor would silently serve page 1 again.
+        raise HTTPException(400, "'before' and 'before_id' must be passed together")
+    if before and before_id:
+        try:
+            before_epoch = int(datetime.fromisoformat(before).timestamp())
+        except ValueError:
+            raise HTTPException(400, "Invalid 'before' timestamp")
+        conditions.append("(created_at, id) < (?, ?)")
+        params.extend([before_epoch, before_id])
+    q = f"SELECT {_CAPTURE_COLUMNS} FROM captures"
+    if conditions:
+        q += " WHERE " + " AND ".join(conditions)
+    q += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    params.append(limit)
+    async with get_ro_db() as db:
         cursor = await db.execute(q, params)
         rows = await cursor.fetchall()
-    finally:
-        await db.close()
 
     return [_build_capture_response(r) for r in rows]
 
 
 @router.get("/captures/{capture_id}", response_model=Capture)
 async def get_capture(capture_id: str):
-    db = await get_db()
-    try:
-        cursor = await db.execute("SELECT * FROM captures WHERE id = ?", (capture_id,))
+    async with get_ro_db() as db:
+        cursor = await db.execute(
+            f"SELECT {_CAPTURE_COLUMNS} FROM captures WHERE id = ?", (capture_id,)
+        )
         row = await cursor.fetchone()
-    finally:
-        await db.close()
     if not row:
         raise HTTPException(404, "Capture not found")
     return _build_capture_response(row)
@@ -232,37 +261,86 @@ async def get_capture(capture_id: str):
 
 @router.get("/captures/{capture_id}/file")
 async def download_capture(capture_id: str):
-    db = await get_db()
-    try:
-        cursor = await db.execute("SELECT * FROM captures WHERE id = ?", (capture_id,))
+    async with get_ro_db() as db:
+        cursor = await db.execute(
+            "SELECT file_path, file_name, status FROM captures WHERE id = ?",
+            (capture_id,),
+        )
         row = await cursor.fetchone()
-    finally:
-        await db.close()
     if not row:
         raise HTTPException(404, "Capture not found")
     if row["status"] != "complete":
         raise HTTPException(409, f"Capture status is '{row['status']}'")
-    return FileResponse(row["file_path"], filename=row["file_name"])
+    # Pre-stat so FileResponse can emit Content-Length/Last-Modified up front
+    # and hand the body off to the server's sendfile path without re-statting.
+    try:
+        stat_result = os.stat(row["file_path"])
+    except FileNotFoundError:
+        raise HTTPException(404, "Capture file is missing from disk")
+    return FileResponse(
+        row["file_path"], filename=row["file_name"], stat_result=stat_result
+    )
 
 
-@router.delete("/captures/{capture_id}")
-async def delete_capture(capture_id: str):
-    db = await get_db()
-    try:
-        cursor = await db.execute("SELECT * FROM captures WHERE id = ?", (capture_id,))
-        row = await cursor.fetchone()
-        if not row:
-            raise HTTPException(404, "Capture not found")
+@router.delete("/captures")
+async def delete_captures(
+    ids: str = Query(..., description="Comma-separated capture IDs"),
+):
+    """Delete several captures with one DB transaction.
+
+    Per-row deletes cost two DB round-trips and a commit each; here the
+    files are unlinked concurrently off the event loop and all rows go in
+    a single DELETE ... IN, so DB commits stay O(1) in the batch size.
+    """
+    id_list = [i for i in (part.strip() for part in ids.split(",")) if i]
+    if not id_list:
+        raise HTTPException(400, "No capture IDs given")
+
+    placeholders = ",".join("?" * len(id_list))
+    async with get_ro_db() as db:
+        cursor = await db.execute(
+            f"SELECT id, file_path FROM captures WHERE id IN ({placeholders})",
+            id_list,
+        )
+        rows = await cursor.fetchall()
+    if not rows:
+        raise HTTPException(404, "No matching captures found")
 
-        # Delete file from disk
+    def _remove(path: str):
         try:
-            os.remove(row["file_path"])
+            os.remove(path)
         except FileNotFoundError:
             pass
 
-        await db.execute("DELETE FROM captures WHERE id = ?", (capture_id,))
-        await db.commit()
-    finally:
-        await db.close()
+    await asyncio.gather(
+        *(asyncio.to_thread(_remove, r["file_path"]) for r in rows)
+    )
+
+    async with write_txn() as rw:
+        await rw.execute(
+            f"DELETE FROM captures WHERE id IN ({placeholders})", id_list
+        )
+
+    return {"deleted": [r["id"] for r in rows]}
+
+
+@router.delete("/captures/{capture_id}")
+async def delete_capture(capture_id: str):
+    async with get_ro_db() as db:
+        cursor = await db.execute(
+            "SELECT file_path FROM captures WHERE id = ?", (capture_id,)
+        )
+        row = await cursor.fetchone()
+    if not row:
+        raise HTTPException(404, "Capture not found")
+
+    # Delete file from disk
+    try:
+        os.remove(row["file_path"])
+    except FileNotFoundError:
+        pass
+
+    async with write_txn() as rw:
+        await rw.execute("DELETE FROM captures WHERE id = ?", (capture_id,))
 
     return {"deleted": capture_id}
\ No newline at end of file
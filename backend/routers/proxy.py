@@ -4,32 +4,100 @@ Credentials are injected server-side so they never reach the client.
 The client only sees paths like /api/proxy/plex?path=/photo/:/transcode?...
 """
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import Response
+import hashlib
+import time
+from collections import OrderedDict
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 import httpx
 
 from config import settings
+from services.http import get_client
 
 router = APIRouter(tags=["proxy"])
 
+# Small in-process cache keyed by upstream URL. The gallery re-requests the
+# same thumbnails in rapid bursts (one per session card, every poll), so
+# repeat hits within the TTL are served from RAM instead of round-tripping
+# to Plex/Jellyfin. Values are (expires_at, body, content_type, etag).
+_CACHE_TTL = 10.0
+_CACHE_MAX = 512
+_cache: OrderedDict[str, tuple[float, bytes, str, str]] = OrderedDict()
+
+
+def _cache_get(url: str) -> tuple[bytes, str, str] | None:
+    entry = _cache.get(url)
+    if entry is None:
+        return None
+    expires_at, body, content_type, etag = entry
+    if expires_at < time.monotonic():
+        del _cache[url]
+        return None
+    _cache.move_to_end(url)
+    return body, content_type, etag
+
+
+def _cache_put(url: str, body: bytes, content_type: str) -> str:
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    _cache[url] = (time.monotonic() + _CACHE_TTL, body, content_type, etag)
+    _cache.move_to_end(url)
+    while len(_cache) > _CACHE_MAX:
+        _cache.popitem(last=False)
+    return etag
 
-async def _fetch(url: str, headers: dict | None = None) -> Response:
+
+async def _fetch(url: str, headers: dict | None = None,
+                 if_none_match: str | None = None) -> Response:
+    cached = _cache_get(url)
+    if cached is not None:
+        body, content_type, etag = cached
+        response_headers = {"Cache-Control": "public, max-age=10", "ETag": etag}
+        if if_none_match == etag:
+            return Response(status_code=304, headers=response_headers)
+        return Response(
+            content=body,
+            media_type=content_type,
+            headers=response_headers,
+        )
+
+    # Cache miss: stream upstream bytes straight to the client instead of
+    # buffering the full body first, teeing chunks into the cache so the
+    # next hit (and its ETag) is served from RAM.
+    client = get_client()
+    request = client.build_request("GET", url, headers=headers or {})
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(url, headers=headers or {})
-            resp.raise_for_status()
+        resp = await client.send(request, stream=True)
     except httpx.HTTPError as e:
         raise HTTPException(502, f"Failed to fetch thumbnail: {e}")
+    if resp.status_code >= 400:
+        await resp.aclose()
+        raise HTTPException(502, f"Failed to fetch thumbnail: HTTP {resp.status_code}")
+
+    content_type = resp.headers.get("content-type", "image/jpeg")
+
+    async def relay():
+        chunks = []
+        try:
+            async for chunk in resp.aiter_bytes(chunk_size=65536):
+                chunks.append(chunk)
+                yield chunk
+            _cache_put(url, b"".join(chunks), content_type)
+        finally:
+            await resp.aclose()
 
-    return Response(
-        content=resp.content,
-        media_type=resp.headers.get("content-type", "image/jpeg"),
+    return StreamingResponse(
+        relay(),
+        media_type=content_type,
         headers={"Cache-Control": "public, max-age=10"},
     )
 
 
 @router.get("/proxy/plex")
-async def proxy_plex(path: str = Query(..., description="Plex path (no host, no token)")):
+async def proxy_plex(
+    request: Request,
+    path: str = Query(..., description="Plex path (no host, no token)"),
+):
     """Proxy a Plex image request, injecting the token server-side."""
     if not settings.plex_enabled:
         raise HTTPException(404, "Plex is not configured")
@@ -40,11 +108,14 @@ async def proxy_plex(path: str = Query(..., description="Plex path (no host, no
 
     separator = "&" if "?" in path else "?"
     url = f"{settings.plex_url.rstrip('/')}{path}{separator}X-Plex-Token={settings.plex_token}"
-    return await _fetch(url)
+    return await _fetch(url, if_none_match=request.headers.get("if-none-match"))
 
 
 @router.get("/proxy/jellyfin")
-async def proxy_jellyfin(path: str = Query(..., description="Jellyfin path (no host, no key)")):
+async def proxy_jellyfin(
+    request: Request,
+    path: str = Query(..., description="Jellyfin path (no host, no key)"),
+):
     """Proxy a Jellyfin image request, injecting the API key server-side."""
     if not settings.jellyfin_enabled:
         raise HTTPException(404, "Jellyfin is not configured")
@@ -54,4 +125,4 @@ async def proxy_jellyfin(path: str = Query(..., description="Jellyfin path (no h
 
     separator = "&" if "?" in path else "?"
     url = f"{settings.jellyfin_url.rstrip('/')}{path}{separator}api_key={settings.jellyfin_api_key}"
-    return await _fetch(url)
\ No newline at end of file
+    return await _fetch(url, if_none_match=request.headers.get("if-none-match"))
\ No newline at end of file
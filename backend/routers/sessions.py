@@ -1,9 +1,9 @@
 """Sessions router — lists active playback sessions."""
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 
 from models import Session
-from services.session_manager import get_all_sessions
+from services.session_manager import get_all_sessions_json
 
 router = APIRouter(tags=["sessions"])
 
@@ -12,6 +12,8 @@ router = APIRouter(tags=["sessions"])
 async def list_sessions():
     """Return all active playback sessions across Plex and Jellyfin."""
     try:
-        return await get_all_sessions()
+        payload = await get_all_sessions_json()
     except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Error fetching sessions: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=502, detail=f"Error fetching sessions: {e}")
+    # Serialized once at refresh time; responding is just a bytes write.
+    return Response(content=payload, media_type="application/json")
@@ -1,71 +1,242 @@
 """FFmpeg wrapper for screenshot and clip extraction."""
 
 import asyncio
+import bisect
+import json
 import logging
 import os
+import subprocess
 from pathlib import Path
 
 from config import settings
+from database import get_ro_db, write_txn
 
 logger = logging.getLogger(__name__)
 
+# Cap concurrent ffmpeg processes at half the cores: a burst of captures
+# queues at the semaphore instead of oversubscribing CPU and disk, which
+# keeps throughput near peak and p99 latency bounded.
+_FF_SEM = asyncio.Semaphore(max(1, (os.cpu_count() or 2) // 2))
+
+# Resolved hardware decoder, set once by detect_hwaccel() at startup.
+# Empty string means software decode.
+_hwaccel = ""
+
+# Preference order when HWACCEL=auto; first one ffmpeg reports wins.
+_HWACCEL_PREFERENCE = ("vaapi", "cuda", "videotoolbox")
+
+
+async def detect_hwaccel() -> None:
+    """Resolve the hardware decode method once. Called from app startup."""
+    global _hwaccel
+    if settings.hwaccel in ("", "none"):
+        _hwaccel = ""
+        return
+    if settings.hwaccel != "auto":
+        _hwaccel = settings.hwaccel
+        logger.info("Using configured hwaccel: %s", _hwaccel)
+        return
+
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            settings.ffmpeg_path, "-hide_banner", "-hwaccels",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, _ = await proc.communicate()
+    except OSError as e:
+        logger.warning("Could not probe hwaccels: %s", e)
+        return
+
+    available = set(stdout.decode().split())
+    for accel in _HWACCEL_PREFERENCE:
+        if accel in available:
+            _hwaccel = accel
+            logger.info("Auto-detected hwaccel: %s", accel)
+            return
+    logger.info("No supported hwaccel found; using software decode")
+
+
+def _hwaccel_args() -> list[str]:
+    """Decode-acceleration flags, to be placed before -i."""
+    if not _hwaccel:
+        return []
+    # No -hwaccel_output_format: ffmpeg transfers decoded frames back to
+    # system memory automatically so the mjpeg encoder works unchanged.
+    return ["-hwaccel", _hwaccel]
+
+
+async def _run_ffmpeg(cmd: list[str]) -> None:
+    """Run an ffmpeg command off the event loop and raise on failure.
+
+    Uses subprocess.run in a worker thread rather than
+    asyncio.create_subprocess_exec: with close_fds=False, shell=False and no
+    preexec_fn, CPython takes its posix_spawn fast path and skips copying the
+    parent's page tables on every launch — measurable once captures happen
+    dozens of times a minute from a large-RSS process.
+    """
+    async with _FF_SEM:
+        proc = await asyncio.to_thread(
+            subprocess.run,
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            close_fds=False,
+        )
+    if proc.returncode != 0:
+        err = proc.stderr.decode().strip()
+        logger.error("FFmpeg failed (code %d): %s", proc.returncode, err)
+        raise RuntimeError(f"FFmpeg failed: {err}")
+
+
+def _output_size(output_path: str) -> int:
+    """Size of the finished output in bytes. One stat covers both the
+    existence check and the size callers previously re-statted for."""
+    try:
+        return os.stat(output_path).st_size
+    except FileNotFoundError:
+        raise RuntimeError("FFmpeg produced no output file")
+
 
 def _seconds_to_timecode(seconds: float) -> str:
-    """Convert seconds to HH:MM:SS.mmm timecode."""
-    h = int(seconds // 3600)
-    m = int((seconds % 3600) // 60)
-    s = seconds % 60
-    return f"{h:02d}:{m:02d}:{s:06.3f}"
+    """Convert seconds to HH:MM:SS.mmm timecode.
+
+    Works in whole milliseconds with divmod — integer division is cheaper
+    than repeated float modulo and avoids rounding surprises at the .999
+    boundaries.
+    """
+    ms = int(round(seconds * 1000))
+    h, ms = divmod(ms, 3_600_000)
+    m, ms = divmod(ms, 60_000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}"
 
 
 async def extract_screenshot(
     media_path: str,
     timestamp_seconds: float,
     output_path: str,
-) -> None:
+) -> int:
     """
     Extract a single frame from a media file at the given timestamp.
+    Returns the output file size in bytes.
 
-    Uses a two-pass seek for frame-accurate extraction:
-    1. Coarse input-level seek (-ss before -i) with -noaccurate_seek to jump
-       to the nearest keyframe ~5s before the target (fast demuxer seek).
-    2. Fine output-level seek (-ss after -i) to decode forward to the exact
-       frame using PTS ordering, avoiding B-frame reordering inaccuracies.
-    """
-    SEEK_BUFFER = 5.0
-    coarse = max(0.0, timestamp_seconds - SEEK_BUFFER)
-    fine = timestamp_seconds - coarse
+    Default: a single input-level seek (-ss before -i) grabs the keyframe
+    nearest the target — one demuxer jump, no decode-forward, typically
+    well under a second even on large files.
 
-    ts_coarse = _seconds_to_timecode(coarse)
-    ts_fine = _seconds_to_timecode(fine)
+    With SCREENSHOT_ACCURATE set: a coarse input seek lands ~2s before the
+    target, then an output-level -ss decodes forward to the exact frame.
+    Slower, but frame-accurate on sparse-keyframe streams (HEVC/AV1).
+    """
+    if settings.screenshot_accurate:
+        SEEK_BUFFER = 2.0
+        coarse = max(0.0, timestamp_seconds - SEEK_BUFFER)
+        seek_args = [
+            "-ss", _seconds_to_timecode(coarse),
+            "-i", media_path,
+            "-ss", _seconds_to_timecode(timestamp_seconds - coarse),
+        ]
+    else:
+        seek_args = [
+            "-ss", _seconds_to_timecode(timestamp_seconds),
+            "-i", media_path,
+        ]
 
     cmd = [
         settings.ffmpeg_path,
-        "-noaccurate_seek",            # keyframe-only jump (skip DTS decode-forward)
-        "-ss", ts_coarse,              # coarse: land near target
-        "-i", media_path,              # input file
-        "-ss", ts_fine,                # fine: decode to exact frame via PTS
+        *_hwaccel_args(),
+        *seek_args,
+        "-map", "0:v:0",               # video only — skip audio/subtitle/data demux
+        "-an", "-sn", "-dn",
         "-frames:v", "1",              # extract exactly 1 frame
         "-q:v", str(settings.screenshot_quality),  # JPEG quality
         "-y",                          # overwrite output
         output_path,
     ]
 
-    logger.info("FFmpeg screenshot: %s @ coarse=%s fine=%s -> %s", media_path, ts_coarse, ts_fine, output_path)
-    proc = await asyncio.create_subprocess_exec(
-        *cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    _, stderr = await proc.communicate()
+    logger.info("FFmpeg screenshot: %s @ %.3fs -> %s", media_path, timestamp_seconds, output_path)
+    await _run_ffmpeg(cmd)
+    return _output_size(output_path)
 
+
+async def _probe_keyframes(media_path: str) -> list[float]:
+    """List a file's video keyframe timestamps via ffprobe (seconds, ascending)."""
+    cmd = [
+        settings.ffprobe_path,
+        "-v", "error",
+        "-select_streams", "v:0",
+        "-skip_frame", "nokey",
+        "-show_entries", "frame=pts_time",
+        "-of", "csv=p=0",
+        media_path,
+    ]
+    try:
+        # A keyframe scan demuxes the whole file — count it against the same
+        # process cap as ffmpeg, or N first-clip requests on distinct files
+        # would launch N unbounded probes.
+        async with _FF_SEM:
+            proc = await asyncio.to_thread(
+                subprocess.run, cmd,
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, close_fds=False,
+            )
+    except OSError as e:
+        logger.warning("Could not run ffprobe: %s", e)
+        return []
     if proc.returncode != 0:
-        err = stderr.decode().strip()
-        logger.error("FFmpeg failed (code %d): %s", proc.returncode, err)
-        raise RuntimeError(f"FFmpeg failed: {err}")
+        logger.warning(
+            "ffprobe keyframe scan failed for %s: %s",
+            media_path, proc.stderr.decode().strip(),
+        )
+        return []
+    times = []
+    for line in proc.stdout.decode().split():
+        try:
+            times.append(float(line.strip(",")))
+        except ValueError:
+            continue
+    times.sort()
+    return times
 
-    if not os.path.exists(output_path):
-        raise RuntimeError("FFmpeg produced no output file")
+
+async def snap_to_keyframe(media_path: str, start_seconds: float) -> float:
+    """Snap a clip start to the nearest preceding keyframe.
+
+    Stream copy cuts on keyframes anyway; handing ffmpeg the exact keyframe
+    time means its -ss lands in one demuxer seek instead of scanning the
+    container (slow on MKV/TS). Keyframe lists are cached in SQLite keyed by
+    (path, mtime, size); the first clip for a file pays one ffprobe scan.
+    Falls back to the requested start if probing fails.
+    """
+    try:
+        st = os.stat(media_path)
+    except OSError:
+        return start_seconds
+
+    times: list[float] = []
+    async with get_ro_db() as ro:
+        cursor = await ro.execute(
+            "SELECT mtime, file_size, keyframe_times FROM media_keyframes"
+            " WHERE media_path = ?",
+            (media_path,),
+        )
+        row = await cursor.fetchone()
+    if row and row["mtime"] == st.st_mtime and row["file_size"] == st.st_size:
+        times = json.loads(row["keyframe_times"])
+    else:
+        times = await _probe_keyframes(media_path)
+        if not times:
+            return start_seconds
+        async with write_txn() as rw:
+            await rw.execute(
+                "INSERT OR REPLACE INTO media_keyframes"
+                " (media_path, mtime, file_size, keyframe_times)"
+                " VALUES (?, ?, ?, ?)",
+                (media_path, st.st_mtime, st.st_size, json.dumps(times)),
+            )
+
+    idx = bisect.bisect_right(times, start_seconds) - 1
+    return times[idx] if idx >= 0 else start_seconds
 
 
 async def extract_clip(
@@ -73,9 +244,10 @@ async def extract_clip(
     start_seconds: float,
     duration_seconds: float,
     output_path: str,
-) -> None:
+) -> int:
     """
     Extract a video clip from a media file using stream copy.
+    Returns the output file size in bytes.
 
     Uses -c copy for near-instant extraction. Cut points snap to nearest
     keyframes, so timing may be off by a few seconds.
@@ -83,7 +255,10 @@ async def extract_clip(
     ts_start = _seconds_to_timecode(start_seconds)
     ts_dur = _seconds_to_timecode(duration_seconds)
 
+    # Clips run as background jobs — lower their scheduling priority so an
+    # in-flight extraction never starves interactive screenshot requests.
     cmd = [
+        "nice", "-n", "10",
         settings.ffmpeg_path,
         "-ss", ts_start,
         "-i", media_path,
@@ -102,17 +277,5 @@ async def extract_clip(
         "FFmpeg clip: %s @ %s for %s -> %s",
         media_path, ts_start, ts_dur, output_path,
     )
-    proc = await asyncio.create_subprocess_exec(
-        *cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    _, stderr = await proc.communicate()
-
-    if proc.returncode != 0:
-        err = stderr.decode().strip()
-        logger.error("FFmpeg failed (code %d): %s", proc.returncode, err)
-        raise RuntimeError(f"FFmpeg failed: {err}")
-
-    if not os.path.exists(output_path):
-        raise RuntimeError("FFmpeg produced no output file")
\ No newline at end of file
+    await _run_ffmpeg(cmd)
+    return _output_size(output_path)
\ No newline at end of file
@@ -0,0 +1,37 @@
+"""Shared httpx client for all upstream Plex/Jellyfin calls.
+
+A per-call AsyncClient pays TCP (and TLS) setup plus DNS on every request.
+One process-wide client keeps connections to the media servers alive and
+pooled across session polls and thumbnail fetches.
+"""
+
+from typing import Optional
+
+import httpx
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(
+                max_keepalive_connections=32,
+                max_connections=64,
+                # Session polls arrive every few seconds; a generous idle
+                # expiry keeps the upstream sockets warm between them.
+                keepalive_expiry=60.0,
+            ),
+        )
+    return _client
+
+
+async def close_client():
+    """Close the shared client. Called at shutdown."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,27 +1,43 @@
 """Jellyfin API client — fetches active playback sessions."""
 
-import httpx
+from typing import Optional
+
+import orjson
 
 from config import settings
 from models import Session
+from services.http import get_client
 
 # Jellyfin returns PositionTicks in 100-nanosecond intervals
 _TICKS_PER_SECOND = 10_000_000
 
+# Conditional-request state: the ETag of the last payload and the session
+# list parsed from it. Sessions sit idle most of the time on a home
+# server, so a 304 Not Modified skips the download and the parse.
+_last_etag: Optional[str] = None
+_last_sessions: list[Session] = []
+
 
 async def get_sessions() -> list[Session]:
     """Query Jellyfin for currently-playing sessions."""
+    global _last_etag, _last_sessions
+
     if not settings.jellyfin_enabled:
         return []
 
     url = f"{settings.jellyfin_url.rstrip('/')}/Sessions"
     headers = {"X-Emby-Token": settings.jellyfin_api_key}
+    if _last_etag:
+        headers["If-None-Match"] = _last_etag
 
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        resp = await client.get(url, headers=headers)
-        resp.raise_for_status()
+    resp = await get_client().get(url, headers=headers, timeout=5.0)
+    if resp.status_code == 304:
+        return _last_sessions
+    resp.raise_for_status()
 
-    data = resp.json()
+    # orjson decodes the raw bytes directly — faster than stdlib json and
+    # fewer small-object allocations on large Sessions payloads.
+    data = orjson.loads(resp.content)
     sessions: list[Session] = []
 
     for s in data:
@@ -67,6 +83,7 @@ async def get_sessions() -> list[Session]:
             source="jellyfin",
             title=title,
             subtitle=subtitle,
+            display_title=f"{title} — {subtitle}".strip(" —"),
             media_path=media_path,
             position_seconds=position_ticks / _TICKS_PER_SECOND,
             duration_seconds=duration_ticks / _TICKS_PER_SECOND,
@@ -74,4 +91,6 @@ async def get_sessions() -> list[Session]:
             year=item.get("ProductionYear"),
         ))
 
+    _last_etag = resp.headers.get("etag")
+    _last_sessions = sessions
     return sessions
\ No newline at end of file
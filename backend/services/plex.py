@@ -1,15 +1,30 @@
 """Plex API client — fetches active playback sessions."""
 
-import xml.etree.ElementTree as ET
+# lxml parses /status/sessions in C (libxml2), several times faster than the
+# stdlib parser on busy session lists polled every few seconds. The stdlib
+# fallback keeps the module importable without it.
+try:
+    from lxml import etree as ET
+except ImportError:  # pragma: no cover
+    import xml.etree.ElementTree as ET
 
-import httpx
+from typing import Optional
 
 from config import settings
 from models import Session
+from services.http import get_client
+
+# Conditional-request state: the ETag of the last payload and the session
+# list parsed from it. Sessions sit idle most of the time on a home
+# server, so a 304 Not Modified skips the download and the parse.
+_last_etag: Optional[str] = None
+_last_sessions: list[Session] = []
 
 
 async def get_sessions() -> list[Session]:
     """Query Plex for currently-playing sessions."""
+    global _last_etag, _last_sessions
+
     if not settings.plex_enabled:
         return []
 
@@ -18,12 +33,16 @@ async def get_sessions() -> list[Session]:
         "X-Plex-Token": settings.plex_token,
         "Accept": "application/xml",
     }
+    if _last_etag:
+        headers["If-None-Match"] = _last_etag
 
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        resp = await client.get(url, headers=headers)
-        resp.raise_for_status()
+    resp = await get_client().get(url, headers=headers, timeout=5.0)
+    if resp.status_code == 304:
+        return _last_sessions
+    resp.raise_for_status()
 
-    root = ET.fromstring(resp.text)
+    # Parse the raw bytes — skips decoding the body to str first.
+    root = ET.fromstring(resp.content)
     sessions: list[Session] = []
 
     for video in root.iter("Video"):
@@ -70,6 +89,7 @@ async def get_sessions() -> list[Session]:
             source="plex",
             title=title,
             subtitle=subtitle,
+            display_title=f"{title} — {subtitle}".strip(" —"),
             media_path=media_path,
             position_seconds=view_offset_ms / 1000.0,
             duration_seconds=duration_ms / 1000.0,
@@ -77,4 +97,6 @@ async def get_sessions() -> list[Session]:
             year=int(video.get("year", 0)) or None,
         ))
 
+    _last_etag = resp.headers.get("etag")
+    _last_sessions = sessions
     return sessions
\ No newline at end of file
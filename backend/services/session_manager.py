@@ -2,40 +2,237 @@
 
 import asyncio
 import logging
-from typing import Optional
+import sys
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from itertools import chain
+from typing import Optional, Sequence
 
+from config import settings
 from models import Session
 from services import jellyfin, plex
 
 logger = logging.getLogger(__name__)
 
-# In-memory cache so we can look up a session by ID for captures
-_session_cache: dict[str, Session] = {}
+# Upper bound on cached sessions. Media servers normally report a handful,
+# but a misbehaving backend churning session IDs must not grow RSS without
+# limit — least-recently-used entries are evicted past this point.
+MAX_CACHE = 512
 
+# In-memory cache so we can look up a session by ID for captures.
+# Ordered oldest-access-first so eviction is O(1) popitem.
+_session_cache: OrderedDict[str, Session] = OrderedDict()
 
-async def get_all_sessions() -> list[Session]:
-    """Fetch sessions from all configured sources concurrently."""
-    tasks = []
-    tasks.append(plex.get_sessions())
-    tasks.append(jellyfin.get_sessions())
+# Per-context override for the cache reads below. The module global stays
+# the authoritative store — the refresher writes from its own task, and a
+# ContextVar set there would never be visible to request handlers — but a
+# test or script can .set() an isolated cache for its context instead of
+# monkey-patching the module global.
+_cache_override: ContextVar[Optional[OrderedDict[str, Session]]] = ContextVar(
+    "session_cache_override", default=None
+)
 
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    sessions: list[Session] = []
 
-    for result in results:
-        if isinstance(result, Exception):
-            logger.warning("Failed to fetch sessions: %s", result)
-            continue
-        sessions.extend(result)
+def _cache() -> OrderedDict[str, Session]:
+    """The session cache visible in the current context."""
+    override = _cache_override.get()
+    return _session_cache if override is None else override
 
-    # Update cache
-    _session_cache.clear()
-    for s in sessions:
-        _session_cache[s.session_id] = s
+
+# Secondary index over the same snapshot: several viewers can play the
+# same file, and capture paths key ffmpeg work by media_path, so this
+# avoids scanning _session_cache.values() for that lookup. Rebuilt in the
+# same refresh pass as the primary cache.
+_by_media_path: dict[str, list[Session]] = {}
+
+# JSON is serialized once per refresh, not once per response: each
+# session's encoded bytes plus the pre-joined list payload the /sessions
+# endpoint returns. Polling dashboards then cost a bytes write per hit.
+_session_json: dict[str, bytes] = {}
+_sessions_payload: bytes = b"[]"
+
+# Serializes refreshes so overlapping polls don't interleave cache writes
+_cache_lock = asyncio.Lock()
+
+# Short TTL with single-flight coalescing: multiple clients polling within
+# the window share one cached snapshot, and concurrent misses share one
+# in-flight upstream fetch instead of each hitting Plex/Jellyfin.
+_TTL_SECONDS = 1.5
+_inflight: Optional[asyncio.Future] = None
+
+# Background refresher. While it runs, get_all_sessions is a pure cache
+# read — upstream load is one poll per interval regardless of how many
+# clients are watching. The event lets capture endpoints pull the next
+# poll forward without blocking on it.
+_refresh_task: Optional[asyncio.Task] = None
+_refresh_now = asyncio.Event()
+
+# Per-backend snapshots with independent freshness timestamps, so each
+# backend is re-queried on its own schedule: a refresh only hits the
+# backends whose snapshot has actually expired, and a failing backend
+# (whose timestamp never advances) is retried without re-fetching the
+# healthy one early.
+_backend_cache: dict[str, tuple[float, list[Session]]] = {}
+
+
+async def _get_backend(name: str, fetch) -> list[Session]:
+    """Return one backend's sessions, serving its cached snapshot within TTL.
+
+    Failures and timeouts are handled here, logged with the backend's
+    name, and degrade to an empty list — a failed backend never raises
+    into (and so never cancels) the TaskGroup running the other fetch.
+    The wait_for deadline keeps a hung backend (e.g. a Jellyfin box that
+    accepts connects but never responds) from stalling the refresh until
+    its socket timeout. On failure the stale timestamp stands, so only
+    the failing backend is retried on the next call.
+    """
+    cached = _backend_cache.get(name)
+    if cached is not None and time.monotonic() - cached[0] < _TTL_SECONDS:
+        return cached[1]
+    try:
+        data = await asyncio.wait_for(fetch(), settings.session_fetch_timeout)
+    except Exception as e:
+        logger.warning("%s session fetch failed: %s", name, e)
+        return []
+    _backend_cache[name] = (time.monotonic(), data)
+    return data
+
+
+async def _do_refresh() -> tuple[Session, ...]:
+    """Fetch sessions from all configured sources and update the cache."""
+    # TaskGroup schedules each fetch as soon as it is created, so both
+    # backends' connects are in flight from the first event-loop tick.
+    async with asyncio.TaskGroup() as tg:
+        plex_task = tg.create_task(_get_backend("plex", plex.get_sessions))
+        jelly_task = tg.create_task(_get_backend("jellyfin", jellyfin.get_sessions))
+
+    # One chained materialization instead of per-backend extend calls.
+    # A tuple: callers get a frozen snapshot, serializers only iterate.
+    sessions = tuple(chain(plex_task.result(), jelly_task.result()))
+
+    # Build the replacement mapping fully, then rebind the module global.
+    # The rebind is a single atomic pointer swap under the GIL: readers see
+    # either the complete old snapshot or the complete new one — never an
+    # empty or half-updated cache — and the old dict is freed in one shot
+    # instead of entry-by-entry tombstoning via clear()/del.
+    global _session_cache, _by_media_path
+    # Keys recur unchanged refresh after refresh (they're str, so intern
+    # applies); interning makes lookups hit the pointer-equality fast path
+    # and shares one string object across the caches and lookup sites.
+    new_cache = OrderedDict((sys.intern(s.session_id), s) for s in sessions)
+    while len(new_cache) > MAX_CACHE:
+        new_cache.popitem(last=False)
+    new_by_path: dict[str, list[Session]] = {}
+    for s in new_cache.values():
+        new_by_path.setdefault(sys.intern(s.media_path), []).append(s)
+    global _session_json, _sessions_payload
+    new_json = {sid: s.model_dump_json().encode() for sid, s in new_cache.items()}
+    new_payload = b"[" + b",".join(new_json.values()) + b"]"
+    async with _cache_lock:
+        _session_cache = new_cache
+        _by_media_path = new_by_path
+        _session_json = new_json
+        _sessions_payload = new_payload
 
     return sessions
 
 
+async def _refresh_loop():
+    """Poll the backends forever, waking early when a refresh is requested."""
+    while True:
+        try:
+            await _do_refresh()
+        except Exception:
+            logger.exception("Session refresh failed")
+        try:
+            await asyncio.wait_for(_refresh_now.wait(), _TTL_SECONDS)
+        except TimeoutError:
+            pass
+        _refresh_now.clear()
+
+
+def start_refresher():
+    """Start the background refresh task. Called at app startup."""
+    global _refresh_task
+    _refresh_task = asyncio.create_task(_refresh_loop())
+
+
+async def stop_refresher():
+    """Cancel the background refresh task. Called at shutdown."""
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+        _refresh_task = None
+
+
+def request_refresh():
+    """Wake the refresher early so the next poll reflects current playback.
+
+    The per-backend snapshots are expired first: the loop already runs on
+    the TTL interval, so an early wake alone would land inside every
+    backend's freshness window and _get_backend would serve cache instead
+    of actually polling upstream.
+    """
+    for name, (_, data) in _backend_cache.items():
+        _backend_cache[name] = (float("-inf"), data)
+    _refresh_now.set()
+
+
+async def get_all_sessions() -> Sequence[Session]:
+    """Return the current sessions, refreshing each backend at most once
+    per TTL window.
+
+    With the background refresher running this is a pure cache read;
+    without it (scripts, tests) it falls back to an on-demand, coalesced
+    fetch. The returned sequence is a frozen snapshot; callers that need
+    to mutate it copy explicitly.
+    """
+    global _inflight
+
+    if _refresh_task is not None:
+        return tuple(_cache().values())
+
+    if _inflight is not None:
+        return await _inflight
+
+    _inflight = asyncio.get_running_loop().create_future()
+    try:
+        sessions = await _do_refresh()
+        _inflight.set_result(sessions)
+        return sessions
+    except BaseException as e:
+        _inflight.set_exception(e)
+        raise
+    finally:
+        _inflight = None
+
+
+async def get_all_sessions_json() -> bytes:
+    """Return the current sessions as a ready-to-send JSON array."""
+    if _refresh_task is None:
+        await get_all_sessions()
+    return _sessions_payload
+
+
+def get_cached_session_json(session_id: str) -> Optional[bytes]:
+    """Return one cached session's pre-serialized JSON, if present."""
+    return _session_json.get(session_id)
+
+
+def get_cached_by_media_path(media_path: str) -> list[Session]:
+    """Return every cached session playing the given file."""
+    return list(_by_media_path.get(media_path, ()))
+
+
 def get_cached_session(session_id: str) -> Optional[Session]:
     """Retrieve a session from the in-memory cache."""
-    return _session_cache.get(session_id)
\ No newline at end of file
+    cache = _cache()  # local ref: refresh may rebind the global
+    session = cache.get(session_id)
+    if session is not None:
+        cache.move_to_end(session_id)  # mark recently used
+    return session
\ No newline at end of file
@@ -5,6 +5,7 @@ export interface Session {
   source: "plex" | "jellyfin";
   title: string;
   subtitle: string;
+  display_title: string;
   media_path: string;
   position_seconds: number;
   duration_seconds: number;
@@ -63,8 +64,14 @@ export const api = {
       body: JSON.stringify(params),
     }),
 
-  getCaptures: (limit = 50, offset = 0) =>
-    request<Capture[]>(`/captures?limit=${limit}&offset=${offset}`),
+  // Keyset pagination: pass the last capture's created_at/id to get the next page.
+  getCaptures: (limit = 50, before?: string, beforeId?: string) =>
+    request<Capture[]>(
+      `/captures?limit=${limit}` +
+        (before && beforeId
+          ? `&before=${encodeURIComponent(before)}&before_id=${beforeId}`
+          : "")
+    ),
 
   getCapture: (id: string) => request<Capture>(`/captures/${id}`),
 